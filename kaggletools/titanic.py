@@ -16,8 +16,14 @@ Classed sefined here:
 
 import numpy as np
 import pandas as pd
+import re
 import warnings
 
+# Regular expressions used to parse the Name column, compiled once.
+_TITLE_PATTERN = re.compile("([A-Za-z]+)\\.")
+_MAIDEN_NAME_PATTERN = re.compile("([A-Za-z'-]+)\\)$")
+_DOUBLE_LASTNAME_PATTERN = re.compile("^[A-Za-z]+-([A-Za-z]+)$")
+
 def extract_title(data, titles=None):
     """
     Create a title column meaning whether the `data.Name` column
@@ -70,28 +76,170 @@ def extract_title(data, titles=None):
         warnings.warn("Using non-default title list is still an experimental feature and may change without deprecation")
     if 'Mr' not in titles or 'Mrs' not in titles or 'Miss' not in titles or 'Master' not in titles:
         raise Exception("Must be able to return Mr, Mrs, Miss and Master titles.")
-    def _mapper(x):
-        if x in ["Mr"]:
-            return titles.index("Mr")
-        elif x in ["Mrs", "Mme"]:
-            return titles.index("Mrs")
-        elif x in ["Miss", "Ms", "Mlle"]:
-            return titles.index("Miss")
-        elif x in ["Master"]:
-            return titles.index("Master")
-        elif x in ["Dr"] and "Dr" in titles:
-            return titles.index("Dr")
-        elif x in ["Capt", "Major", "Col"] and "Military" in titles:
-            return titles.index("Military")
-        elif x in ["Sir", "Count", "Countess"] and "Royal" in titles:
-            return titles.index("Royal")
-        else:
-            return titles.index("Rare")
-    return data.Name.str.extract("([A-Za-z]+)\\.", expand=False).map(_mapper)
+    mapping = {"Mr": titles.index("Mr"),
+               "Mrs": titles.index("Mrs"),
+               "Mme": titles.index("Mrs"),
+               "Miss": titles.index("Miss"),
+               "Ms": titles.index("Miss"),
+               "Mlle": titles.index("Miss"),
+               "Master": titles.index("Master")}
+    if "Dr" in titles:
+        mapping["Dr"] = titles.index("Dr")
+    if "Military" in titles:
+        mapping.update(dict.fromkeys(["Capt", "Major", "Col"], titles.index("Military")))
+    if "Royal" in titles:
+        mapping.update(dict.fromkeys(["Sir", "Count", "Countess"], titles.index("Royal")))
+    codes = data.Name.str.extract(_TITLE_PATTERN, expand=False).map(mapping)
+    # Only require the Rare title if some title is not mapped otherwise.
+    if codes.isna().any():
+        codes = codes.fillna(titles.index("Rare"))
+    return codes.astype("int8")
 
 #
 # The functions used to calculate survival of the passenger's family members.
 #
+def _downcast_ints(data, columns):
+    """
+    Downcast the integer columns among `columns` of the `data` frame to the
+    smallest integer type holding their values, e.g. int8 for the Pclass,
+    SibSp and Parch columns. Missing and non-integer columns (like ones
+    containing NaNs) are left as is.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The data frame to modify in place.
+
+    columns : list
+        Names of the columns to downcast.
+    """
+    for column in columns:
+        if column in data.columns and pd.api.types.is_integer_dtype(data[column]):
+            data[column] = pd.to_numeric(data[column], downcast="integer")
+
+def _survival_indicators(survived):
+    """
+    Convert the Survived column to a pair of int8 indicator arrays.
+
+    Parameters
+    ----------
+    survived : pandas.Series
+        The Survived column, 1, 0 or NaN.
+
+    Returns
+    -------
+    numpy.ndarray
+        1 for passengers known to survive, 0 for others.
+
+    numpy.ndarray
+        1 for passengers known to die, 0 for others.
+    """
+    # Survived as int8 codes, -1 meaning unknown survival.
+    surv_int = survived.fillna(-1).astype("int8").to_numpy()
+    return (surv_int == 1).astype("int8"), (surv_int == 0).astype("int8")
+
+def _group_outcomes(keys, is_surv, is_died):
+    """
+    Count passengers of the same group (ticket, cabin or family) with every
+    passenger and the survivors and victims among the **other** passengers
+    of this group.
+
+    Parameters
+    ----------
+    keys : pandas.Series
+        The group of every passenger. NaN means the passenger does not
+        belong to any group.
+
+    is_surv, is_died : numpy.ndarray
+        The survival indicators as returned by `_survival_indicators`.
+
+    Returns
+    -------
+    numpy.ndarray
+        The number of passengers in the passenger's group.
+
+    numpy.ndarray
+        The number of other passengers of the group known to survive.
+
+    numpy.ndarray
+        The number of other passengers of the group known to die.
+
+    All the three arrays are float and contain NaN for passengers not
+    belonging to any group.
+    """
+    # Number the groups and count everything with np.bincount over the
+    # group numbers, passengers not belonging to any group get code -1.
+    codes, uniques = pd.factorize(keys, sort=False)
+    grouped = codes >= 0
+    group_codes = codes[grouped]
+    sizes = np.bincount(group_codes, minlength=len(uniques))
+    surv = np.bincount(group_codes, weights=is_surv[grouped], minlength=len(uniques))
+    died = np.bincount(group_codes, weights=is_died[grouped], minlength=len(uniques))
+    count = np.full(len(codes), np.NaN)
+    other_surv = np.full(len(codes), np.NaN)
+    other_died = np.full(len(codes), np.NaN)
+    count[grouped] = sizes[group_codes]
+    other_surv[grouped] = surv[group_codes] - is_surv[grouped]
+    other_died[grouped] = died[group_codes] - is_died[grouped]
+    return count, other_surv, other_died
+
+def _mean_rates(other_surv, other_died):
+    """
+    Calculate the mean Survived value of other passengers of the same group
+    with known survival from their numbers of survivors and victims.
+
+    Parameters
+    ----------
+    other_surv : numpy.ndarray
+        For every passenger, the number of **other** passengers of the
+        same group known to survive.
+
+    other_died : numpy.ndarray
+        For every passenger, the number of **other** passengers of the
+        same group known to die.
+
+    Returns
+    -------
+    numpy.ndarray
+        The survival rates, NaN if survival of no other passenger of the
+        group is known.
+    """
+    total = other_surv + other_died
+    return np.where(total > 0, other_surv / np.where(total > 0, total, 1), np.NaN)
+
+def _simplified_rates(other_surv, other_died, fill_if_not_any_survived=False):
+    """
+    Calculate the simplified survival rates from the numbers of other
+    passengers of the same group known to survive and known to die.
+
+    Parameters
+    ----------
+    other_surv : numpy.ndarray
+        For every passenger, the number of **other** passengers of the
+        same group (ticket, cabin or family) known to survive.
+
+    other_died : numpy.ndarray
+        For every passenger, the number of **other** passengers of the
+        same group known to die.
+
+    fill_if_not_any_survived : bool, default False
+        If False, the rate is 1 if all other passengers with known survival
+        survived and 0 if they all died. If True, the rate is 1 if any other
+        passenger survived and 0 if none survived but any died.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of 1.0, 0.0 or NaN values, the NaN meaning the rate should be
+        taken from some filler.
+    """
+    if fill_if_not_any_survived:
+        conditions = [other_surv > 0, other_died > 0]
+    else:
+        conditions = [(other_surv > 0) & (other_died == 0),
+                      (other_died > 0) & (other_surv == 0)]
+    return np.select(conditions, [1.0, 0.0], np.NaN)
+
 class TicketCounter(object):
     """
     The object used to calculate the passengers with same ticket number with
@@ -146,49 +294,30 @@ class TicketCounter(object):
         self.data = data
         self.simplified = simplified
         self.fill_if_not_any_survived = fill_if_not_any_survived
+        # Compare and group ticket numbers by their integer category codes.
+        self.data['Ticket'] = self.data['Ticket'].astype('category')
+        _downcast_ints(self.data, ['Pclass'])
+        self._is_surv, self._is_died = _survival_indicators(self.data.Survived)
 
     def fill_ticket_rates(self):
         """
         Adds the TicketCount and TicketRate columns to the `self.data` frame
         referring to the `data` argument of the constructor.
         """
-        counts = {}
-        surv = {}
-        died = {}
-        for t in self.data.Ticket.unique():
-            counts[t] = self.data[self.data.Ticket == t].PassengerId.count()
-            surv[t] = self.data[(self.data.Ticket == t) & (self.data.Survived == 1)].Survived.count()
-            died[t] = self.data[(self.data.Ticket == t) & (self.data.Survived == 0)].Survived.count()
-        self.data["TicketCount"] = self.data.Ticket.map(lambda x: counts[x])
-        self.data["TicketRate"] = np.NaN
-        for i in self.data.index:
-            ticket = self.data.loc[i, "Ticket"]
-            pid = self.data.loc[i, "PassengerId"]
-            if self.simplified:
-                if self.fill_if_not_any_survived:
-                    if self.data.loc[(self.data.Ticket == ticket) & (self.data.PassengerId != pid)].Survived.max() == 1.0:
-                        self.data.loc[i, "TicketRate"] = 1.0
-                    elif self.data.loc[(self.data.Ticket == ticket) & (self.data.PassengerId != pid)].Survived.min() == 0.0:
-                        self.data.loc[i, "TicketRate"] = 0.0
-                else:
-                    if self.data.loc[(self.data.Ticket == ticket) & (self.data.PassengerId != pid)].Survived.min() == 1.0:
-                        self.data.loc[i, "TicketRate"] = 1.0
-                    elif self.data.loc[(self.data.Ticket == ticket) & (self.data.PassengerId != pid)].Survived.max() == 0.0:
-                        self.data.loc[i, "TicketRate"] = 0.0
-            else:
-                s = surv[self.data.loc[i, "Ticket"]]
-                d = died[self.data.loc[i, "Ticket"]]
-                if np.isfinite(self.data.loc[i].Survived) and (self.data.loc[i].Survived == 1):
-                    s -= 1
-                if np.isfinite(self.data.loc[i].Survived) and (self.data.loc[i].Survived == 0):
-                    d -= 1
-                if s + d:
-                    self.data.loc[i, "TicketRate"] = float(s) / float(s + d)
+        count, s, d = _group_outcomes(self.data.Ticket, self._is_surv, self._is_died)
+        self.data["TicketCount"] = count.astype("int64")
+        # Only calculate rates for passengers having other passengers with the
+        # same ticket and known survival, the others get the filler directly.
+        info = (s + d) > 0
+        rate = np.full(len(self.data), np.NaN)
         if self.simplified:
-            self.data["TicketRate"] = self.data["TicketRate"].fillna(0.5)
+            rate[info] = _simplified_rates(s[info], d[info], self.fill_if_not_any_survived)
+            self.data["TicketRate"] = np.where(np.isnan(rate), 0.5, rate)
         else:
-            for c in self.data.Pclass.unique():
-                self.data.loc[self.data.Pclass == c, "TicketRate"] = self.data.loc[self.data.Pclass == c, "TicketRate"].fillna(self.data.loc[(self.data.Pclass == c), "Survived"].mean())
+            rate[info] = _mean_rates(s[info], d[info])
+            class_rates = self.data.groupby("Pclass").Survived.transform("mean").to_numpy()
+            rate[~info] = class_rates[~info]
+            self.data["TicketRate"] = rate
 
 class CabinCounter(object):
     """
@@ -240,13 +369,14 @@ class CabinCounter(object):
         """
         self.data = data
         self.simplified = simplified
+        self.data['Cabin'] = self.data['Cabin'].astype('category')
+        _downcast_ints(self.data, ['Pclass'])
+        self._is_surv, self._is_died = _survival_indicators(self.data.Survived)
         if filler is None:
             if simplified:
                 self.filler = pd.Series(0.5, index=data.index)
             else:
-                self.filler = pd.Series(np.NaN, index=data.index)
-                for c in self.data.Pclass.unique():
-                    self.filler.loc[self.data.Pclass == c] = self.data.loc[self.data.Pclass == c, "Survived"].mean()
+                self.filler = self.data.groupby("Pclass").Survived.transform("mean")
         else:
             self.filler = filler
 
@@ -255,163 +385,157 @@ class CabinCounter(object):
         Adds the CabinCount and CabinRate columns to the `self.data` data frame,
         that is a referrence to the `data` parameter of the constructor.
         """
-        counts = {}
-        surv = {}
-        died = {}
-        for c in self.data.loc[~self.data.Cabin.isna(), "Cabin"].unique():
-            counts[c] = self.data[self.data.Cabin == c].PassengerId.count()
-            surv[c] = self.data[(self.data.Cabin == c) & (self.data.Survived == 1)].Survived.count()
-            died[c] = self.data[(self.data.Cabin == c) & (self.data.Survived == 0)].Survived.count()
-        self.data.loc[self.data.Cabin.isna(), "CabinCount"] = 0
-        self.data.loc[~self.data.Cabin.isna(), "CabinCount"] = self. data.loc[~self.data.Cabin.isna(), "Cabin"].map(lambda x: counts[x])
-        self.data["CabinRate"] = np.NaN
-        for i in self.data.index:
-            if not self.data.loc[i, "Cabin"] in counts:
-                continue
-            cabin = self.data.loc[i, "Cabin"]
-            pid = self.data.loc[i, "PassengerId"]
-            if self.simplified:
-                if self.data.loc[(self.data.Cabin == cabin) & (self.data.PassengerId != pid)].Survived.min() == 1.0:
-                    self.data.loc[i, "CabinRate"] = 1.0
-                elif self.data.loc[(self.data.Cabin == cabin) & (self.data.PassengerId != pid)].Survived.max() == 0.0:
-                    self.data.loc[i, "CabinRate"] = 0.0
-            else:
-                s = surv[cabin]
-                d = died[cabin]
-                if np.isfinite(self.data.loc[i].Survived) and (self.data.loc[i].Survived == 1):
-                    s -= 1
-                if np.isfinite(self.data.loc[i].Survived) and (self.data.loc[i].Survived == 0):
-                    d -= 1
-                if s + d:
-                    self.data.loc[i, "CabinRate"] = float(s) / float(s + d)
+        # The counts are NaN for passengers without a cabin number, so their
+        # rates are left NaN and taken from the filler.
+        count, s, d = _group_outcomes(self.data.Cabin, self._is_surv, self._is_died)
+        self.data["CabinCount"] = np.where(np.isnan(count), 0, count)
+        if self.simplified:
+            self.data["CabinRate"] = _simplified_rates(s, d)
+        else:
+            self.data["CabinRate"] = _mean_rates(s, d)
         self.data.loc[self.data.CabinRate.isna(), "CabinRate"] = self.filler.loc[self.data.CabinRate.isna()]
 
-class FamilyPredictor(object):
-    """
-    Object used to add family survival information to Titanic dataset.
+def _assign_families(pclass, embarked, lastname, secondary, alone):
     """
+    Assign passengers to family groups. A passenger travelling not alone
+    joins the first family group of the same class and port of embarkation
+    having the same lastname or, if there is no such group, the group with
+    lastname matching his/her secondary lastname. Otherwise, a new family
+    group is created for the passenger.
 
-    def _new_family(self, i):
-        """
-        Add a new family group to the `self.families` list and place the passenger
-        with index `i` to that group.
+    All the arguments are integer codes (as returned by `pandas.factorize`)
+    so the loop does not touch any pandas object.
 
-        Parameters
-        ----------
-        i : int
-            The index of a passenger that should be added to the new family group.
-            Must be a valid index of `self.data` frame that is a referrence
-            to the `data` argument of the `self` constructor. Note that this
-            function does not add the passenger to the family by itself, it 
-            only sets appropriate family parameters (class, port of embarkation,
-            etc.) to parameters of this passenger.
-
-        Returns
-        -------
-        int :
-            The index of the new family group. It should then be assinged
-            to `self.data.Family[i]` to add the passenger to the new goup.
-        """
-        idx = len(self.families)
-        self.families.loc[idx,'Pclass'] = self.data.loc[i, "Pclass"]
-        self.families.loc[idx,'Embarked'] = self.data.loc[i, "Embarked"]
-        self.families.loc[idx,'Lastname'] = self.data.loc[i, "Lastname"]
-        self.families.loc[idx,'Size'] = 0
-        self.families.loc[idx,'Id'] = idx
-        return idx
-
-    def _find_family(self, i):
-        """
-        Looks for a good family group to add the passenger with index `i` to
-        may return an existing group, but also may create a new family group.
+    Parameters
+    ----------
+    pclass : numpy.ndarray
+        Codes of the Pclass values.
 
-        Parameters
-        ----------
-        i : int
-            Index of a passenger in `self.data` frame.
-
-        Returns
-        -------
-        int :
-            The index of the family group suitable for the given (by index `i`)
-            passenger. May be either an already existing family group or a
-            just created family group. The `Family` column for the passenger will
-            not be updated, it still should be done separately.
-        """
-        fams = self.families.loc[(self.families.Pclass == self.data.loc[i, "Pclass"]) & (self.families.Embarked == self.data.loc[i, "Embarked"])]
-        if not len(fams):
-            return self._new_family(i)
-        exact = fams.loc[fams.Lastname == self.data.loc[i, "Lastname"]]
-        if len(exact):
-            return exact.iloc[0].Id
-        if self.data.loc[i, "SecondaryLastname"] == np.NaN:
-            return self._new_family(i)
-        secondary = fams.loc[fams.Lastname == self.data.loc[i, "SecondaryLastname"]]
-        if len(exact):
-            return exact.iloc[0].Id
-        else:
-            return self._new_family(i)
+    embarked : numpy.ndarray
+        Codes of the Embarked values.
+
+    lastname : numpy.ndarray
+        Codes of the Lastname values.
+
+    secondary : numpy.ndarray
+        Codes of the SecondaryLastname values, sharing the code space with
+        `lastname`. Negative codes mean no secondary lastname.
+
+    alone : numpy.ndarray
+        Boolean array, True for passengers having neither siblings, spouses,
+        parents nor children aboard. They are not assigned to any family.
+
+    Returns
+    -------
+    numpy.ndarray
+        Family group identifiers of the passengers, -1 for alone ones.
+
+    numpy.ndarray
+        Positions of the passengers the family groups were created for,
+        one for every family group.
+    """
+    family = np.full(len(pclass), -1, dtype=np.int64)
+    founders = []
+    index = {}
+    for i in range(len(pclass)):
+        if alone[i]:
+            continue
+        fid = index.get((pclass[i], embarked[i], lastname[i]), -1)
+        if fid < 0 and secondary[i] >= 0:
+            fid = index.get((pclass[i], embarked[i], secondary[i]), -1)
+        if fid < 0:
+            fid = len(founders)
+            founders.append(i)
+            index[(pclass[i], embarked[i], lastname[i])] = fid
+        family[i] = fid
+    return family, np.array(founders, dtype=np.int64)
+
+class FamilyPredictor(object):
+    """
+    Object used to add family survival information to Titanic dataset.
+    """
 
     def _fill_family_ids(self):
         """
         Adds the `Family` column to the `self.data` frame. This column will contain
-        the family identifiers assigned to the passengers.
+        the family identifiers assigned to the passengers. The family groups
+        found are stored to the `self.families` data frame.
         """
-        self.families = pd.DataFrame(columns=['Pclass', 'Embarked', 'Lastname', 'Id', 'Size'])
+        # Family groups are collected to a list of dicts and converted to
+        # a data frame only once all passengers are processed.
+        self.families_list = []
         self.data["Family"] = np.NaN
         if self.use_fare:
-            self.data["Family"] = np.NaN
-            fid = 0
-            for i in self.data.index:
-                f = self.data.loc[i].Fare
-                l = self.data.loc[i].Lastname
-                if np.isfinite(self.data.loc[i].Family):
-                    continue
-                self.data.loc[(self.data.Fare == f) & (self.data.Lastname == l), "Family"] = fid
-                fid += 1
+            # Every distinct (Fare, Lastname) pair is a family, numbered in
+            # order of the first appearance. Passengers with unknown fare
+            # are not assigned to any family.
+            fid = self.data.groupby(["Fare", "Lastname"], observed=True, sort=False).ngroup()
+            self.data["Family"] = fid.where(self.data.Fare.notna() & self.data.Lastname.notna()).astype("float64")
         else:
-            for i in self.data.index:
-                # Leave family ID NAN if no family.
-                if self.data.loc[i, "SibSp"] == 0 and self.data.loc[i, "Parch"] == 0:
+            n = len(self.data)
+            names, _ = pd.factorize(np.concatenate([self.data.Lastname.to_numpy(dtype=object),
+                                                    self.data.SecondaryLastname.to_numpy(dtype=object)]))
+            family, founders = _assign_families(pd.factorize(self.data.Pclass)[0],
+                                                pd.factorize(self.data.Embarked)[0],
+                                                names[:n],
+                                                names[n:],
+                                                ((self.data.SibSp == 0) & (self.data.Parch == 0)).to_numpy())
+            # Leave family ID NAN if no family.
+            self.data["Family"] = np.where(family >= 0, family, np.NaN)
+            sizes = np.bincount(family[family >= 0], minlength=len(founders))
+            for fid, (i, size) in enumerate(zip(founders, sizes)):
+                self.families_list.append({'Pclass': self.data.Pclass.iloc[i],
+                                           'Embarked': self.data.Embarked.iloc[i],
+                                           'Lastname': self.data.Lastname.iloc[i],
+                                           'Id': fid,
+                                           'Size': int(size)})
+            pids = self.data.PassengerId.to_numpy()
+            pclasses = self.data.Pclass.to_numpy()
+            embarked = self.data.Embarked.to_numpy()
+            secondary = self.data.SecondaryLastname.to_numpy(dtype=object)
+            no_secondary = self.data.SecondaryLastname.isna().to_numpy()
+            sibsp = self.data.SibSp.to_numpy()
+            sex = self.data.Sex.to_numpy()
+            family_ids = self.data.Family.to_numpy(dtype="float64")
+            # The first family group with each lastname.
+            by_lastname = {}
+            for family in self.families_list:
+                by_lastname.setdefault(family['Lastname'], family['Id'])
+            for family in self.families_list:
+                if family['Size'] != 1:
                     continue
-                self.data.loc[i, "Family"] = self._find_family(i)
-                f = self.data.loc[i, "Family"]
-                self.families.loc[self.families.Id == f, "Size"] = self.families.loc[self.families.Id == f, "Size"] + 1
-            for f in self.families.index:
-                if self.families.loc[f].Size != 1:
+                # Family sizes never decrease except being zeroed on merging,
+                # so a group of size one still consists of the passenger it
+                # was created for only.
+                pos = founders[family['Id']]
+                pid = pids[pos]
+                pclass = pclasses[pos]
+                emb = embarked[pos]
+                if no_secondary[pos]:
                     continue
-                fid = self.families.loc[f].Id
-                pid = self.data.loc[self.data.Family == fid, "PassengerId"].iloc[0]
-                pclass = self.data.loc[self.data.Family == fid, "Pclass"].iloc[0]
-                emb = self.data.loc[self.data.Family == fid, "Embarked"].iloc[0]
-                second_name = self.data.loc[self.data.Family == fid, "SecondaryLastname"].iloc[0]
-                if second_name == np.NaN:
+                second_name = secondary[pos]
+                fam_id = by_lastname.get(second_name)
+                if fam_id is not None:
+                    self.families_list[fam_id]['Size'] += 1
+                    family_ids[pos] = fam_id
+                    family['Size'] = 0
                     continue
-                fams = self.families.loc[self.families.Lastname == second_name]
-                for fam in fams.index:
-                    fam_id = fams.loc[fam].Id
-                    c = self.data.loc[self.data.Family == fid, "Family"].count()
-                    self.families.loc[self.families.Id == fam_id, "Size"] = self.families.loc[self.families.Id == fam_id, "Size"] + c
-                    self.data.loc[self.data.Family == fid, "Family"] = fam_id
-                    self.families.loc[f, "Size"] = 0
-                    break
-                if self.families.loc[f, "Size"] == 0:
+                if sibsp[pos] == 0:
                     continue
-                if self.data.loc[self.data.PassengerId == pid, "SibSp"].iloc[0] == 0:
+                if sex[pos] != 1:
                     continue
-                if self.data.loc[self.data.PassengerId == pid, "Sex"].iloc[0] != 1:
-                    continue
-                sisters = self.data.loc[(self.data.SecondaryLastname == second_name) &
-                                        (self.data.Sex == 'female') &
-                                        (self.data.Pclass == pclass) &
-                                        (self.data.Embarked == emb) &
-                                        (self.data.PassengerId != pid)]
+                sisters = np.flatnonzero((secondary == second_name) &
+                                         (sex == 'female') &
+                                         (pclasses == pclass) &
+                                         (embarked == emb) &
+                                         (pids != pid))
                 if len(sisters) > 0:
-                    fam_id = sisters.iloc[0].Family
-                    c = self.data.loc[self.data.Family == fid, "Family"].count()
-                    self.families.loc[self.families.Id == fam_id, "Size"] = self.families.loc[self.families.Id == fam_id, "Size"] + c
-                    self.data.loc[data.Family == fid, "Family"] = fam_id
-                    self.families.loc[f, "Size"] = 0
+                    fam_id = int(family_ids[sisters[0]])
+                    self.families_list[fam_id]['Size'] += 1
+                    family_ids[pos] = fam_id
+                    family['Size'] = 0
+            self.data["Family"] = family_ids
+        self.families = pd.DataFrame(self.families_list, columns=['Pclass', 'Embarked', 'Lastname', 'Id', 'Size'])
 
     def __init__(self, data, filler=None, simplified=False, use_fare=False, fill_if_not_any_survived=False):
         """
@@ -476,18 +600,23 @@ class FamilyPredictor(object):
         self.simplified = simplified
         self.use_fare = use_fare
         self.fill_if_not_any_survived = fill_if_not_any_survived
+        _downcast_ints(self.data, ['Pclass', 'SibSp', 'Parch'])
+        self._is_surv, self._is_died = _survival_indicators(self.data.Survived)
+        # String methods of a categorical column only process its categories,
+        # so the double lastname is looked for once per distinct lastname.
         if 'Lastname' not in list(self.data.columns):
-            self.data['Lastname'] = self.data['Name'].apply(lambda x: str.split(x, ",")[0])
+            self.data['Lastname'] = self.data['Name'].str.split(",", n=1, expand=True)[0].astype('category')
+        else:
+            self.data['Lastname'] = self.data['Lastname'].astype('category')
         if 'SecondaryLastname' not in list(self.data.columns):
-            self.data['SecondaryLastname'] = self.data.Name.str.extract("([A-Za-z'-]+)\\)$", expand=False)
-            self.data['SecondaryLastname'] = self.data['SecondaryLastname'].fillna(self.data.Lastname.str.extract("^[A-Za-z]+-([A-Za-z]+)$", expand=False))
+            self.data['SecondaryLastname'] = self.data.Name.str.extract(_MAIDEN_NAME_PATTERN, expand=False)
+            self.data['SecondaryLastname'] = self.data['SecondaryLastname'].fillna(self.data.Lastname.str.extract(_DOUBLE_LASTNAME_PATTERN, expand=False))
+        self.data['SecondaryLastname'] = self.data['SecondaryLastname'].astype('category')
         if filler is None:
             if simplified:
                 self.filler = pd.Series(0.5, index=data.index)
             else:
-                self.filler = pd.Series(np.NaN, index=data.index)
-                for c in self.data.Pclass.unique():
-                    self.filler.loc[self.data.Pclass == c] = self.data.loc[self.data.Pclass == c, "Survived"].mean()
+                self.filler = self.data.groupby("Pclass").Survived.transform("mean")
         else:
             self.filler = filler
 
@@ -498,27 +627,13 @@ class FamilyPredictor(object):
         family, calculated as described in the constructor docstring.
         """
         self._fill_family_ids()
-        self.data["FamilyRate"] = np.NaN
-        for i in self.data.index:
-            if self.data.loc[i, "Family"] == np.NaN:
-                continue
-            fam = self.data.loc[i, "Family"]
-            pid = self.data.loc[i, "PassengerId"]
-            if self.data.loc[self.data.Family == fam, "PassengerId"].count() == 1:
-                continue
-            if self.simplified:
-                if self.fill_if_not_any_survived:
-                    if self.data.loc[(self.data.Family == fam) & (self.data.PassengerId != pid)].Survived.max() == 1.0:
-                        self.data.loc[i, "FamilyRate"] = 1.0
-                    elif self.data.loc[(self.data.Family == fam) & (self.data.PassengerId != pid)].Survived.min() == 0.0:
-                        self.data.loc[i, "FamilyRate"] = 0.0
-                else:
-                    if self.data.loc[(self.data.Family == fam) & (self.data.PassengerId != pid)].Survived.min() == 1.0:
-                        self.data.loc[i, "FamilyRate"] = 1.0
-                    elif self.data.loc[(self.data.Family == fam) & (self.data.PassengerId != pid)].Survived.max() == 0.0:
-                        self.data.loc[i, "FamilyRate"] = 0.0
-            else:
-                self.data.loc[i, "FamilyRate"] = self.data.loc[(self.data.Family == fam) & (self.data.PassengerId != pid)].Survived.mean()
+        # Lone passengers and passengers with no family found get NaN rates
+        # to be taken from the filler.
+        _, s, d = _group_outcomes(self.data.Family, self._is_surv, self._is_died)
+        if self.simplified:
+            self.data["FamilyRate"] = _simplified_rates(s, d, self.fill_if_not_any_survived)
+        else:
+            self.data["FamilyRate"] = _mean_rates(s, d)
         self.data.loc[self.data.FamilyRate.isna(), "FamilyRate"] = self.filler.loc[self.data.FamilyRate.isna()]
         if self.simplified and self.fill_if_not_any_survived:
             self.data.loc[self.data.FamilyRate < 0.75, "FamilyRate"] = self.filler.loc[self.data.FamilyRate < 0.75]
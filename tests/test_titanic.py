@@ -325,6 +325,15 @@ class TestFamilyPredictor(TestCase):
         Check whether the FamilyPredictor object fills the FamilyRate
         column properly if requested to fill it in basic simplified
         way and to find families by Lastname and Fare fields.
+
+    *   `test_basic_rate_with_fare`
+        Check whether the FamilyPredictor object fills the FamilyRate
+        column with mean survival of other family members if families
+        are found by Lastname and Fare fields.
+
+    *   `test_secondary_lastname`
+        Check whether a passenger is added to the family of the same
+        class and port of embarkation matching his/her secondary lastname.
     """
 
     def setUp(self):
@@ -384,3 +393,48 @@ class TestFamilyPredictor(TestCase):
         self.assertAlmostEqual(self.data.FamilyRate[9], 1.0)
         self.assertAlmostEqual(self.data.FamilyRate[10], 0.5)
         self.assertAlmostEqual(self.data.FamilyRate[11], 0.0)
+
+    def test_basic_rate_with_fare(self):
+        """
+        Check whether the FamilyPredictor object fills the FamilyRate
+        column with mean survival of other family members if families
+        are found by Lastname and Fare fields.
+        """
+        FamilyPredictor(self.data,
+                        filler=pd.Series(0.12345, index=self.data.index),
+                        use_fare=True).fill_family_rates()
+        self.assertIn("FamilyRate", self.data.columns)
+        self.assertAlmostEqual(self.data.FamilyRate[0], 2.0 / 3.0)
+        self.assertAlmostEqual(self.data.FamilyRate[1], 1.0 / 3.0)
+        self.assertAlmostEqual(self.data.FamilyRate[2], 2.0 / 3.0)
+        self.assertAlmostEqual(self.data.FamilyRate[3], 1.0 / 3.0)
+        self.assertAlmostEqual(self.data.FamilyRate[4], 0.5)
+        self.assertAlmostEqual(self.data.FamilyRate[5], 0.12345)
+        self.assertAlmostEqual(self.data.FamilyRate[6], 0.0)
+        self.assertAlmostEqual(self.data.FamilyRate[7], 0.12345)
+        self.assertAlmostEqual(self.data.FamilyRate[8], 1.0)
+        self.assertAlmostEqual(self.data.FamilyRate[9], 1.0)
+        self.assertAlmostEqual(self.data.FamilyRate[10], 0.12345)
+        self.assertAlmostEqual(self.data.FamilyRate[11], 0.0)
+
+    def test_secondary_lastname(self):
+        """
+        Check whether a passenger is added to the family of the same
+        class and port of embarkation matching his/her secondary lastname.
+        """
+        data = pd.DataFrame({"Name": ["Smith, Mr. John",
+                                      # Maiden name Smith, sister of John Smith
+                                      "Brown, Mrs. Thomas (Anne Smith)",
+                                      # Travels alone, so does not belong to any family
+                                      "Jones, Mr. Henry"],
+                             "PassengerId": [1, 2, 3],
+                             "Pclass": [1, 1, 1],
+                             "Embarked": ["S", "S", "S"],
+                             "SibSp": [1, 1, 0],
+                             "Parch": [0, 0, 0],
+                             "Sex": ["male", "female", "male"],
+                             "Survived": [0, 1, 1]})
+        FamilyPredictor(data).fill_family_rates()
+        self.assertEqual(data.SecondaryLastname[1], "Smith")
+        self.assertEqual(data.Family[0], data.Family[1])
+        self.assertTrue(np.isnan(data.Family[2]))